@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Sync Record Allocation Benchmark
+Compares per-user memory and CPU of the old dict-based sync path with the
+UserRef / Sample / SyncResult records, without touching Firestore or the API
+Usage: python benchmark_sync_records.py [num_users]
+"""
+
+import copy
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sync_records import USER_FIELDS, UserRef, Sample, SyncResult, STATUS_SUCCESS
+
+
+class FakeDoc:
+    """Minimal stand-in for a Firestore DocumentSnapshot"""
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        # The SDK decodes a fresh set of nested maps on every call
+        return copy.deepcopy(self._data)
+
+
+API_RESPONSE = {
+    'heartRate': 62, 'steps': 8421, 'calories': 2310, 'distance': 6.2,
+    'activeMinutes': 41, 'date': '2025-01-01', 'timezone': 'America/Chicago',
+}
+
+
+def make_docs(num_users):
+    # Roughly the shape of a real users/{uid} document, already synced once
+    latest = Sample(API_RESPONSE).to_latest_dict()
+    return [
+        FakeDoc(f"uid{i:06d}", {
+            'email': f"user{i}@example.com",
+            'selectedDevice': 'fitbit',
+            'deviceConnected': True,
+            'displayName': f"User {i}",
+            'settings': {'units': 'metric', 'notifications': True, 'timezone': 'America/Chicago'},
+            'fitbitData': {
+                'accessToken': 'a' * 200,
+                'refreshToken': 'r' * 64,
+                'tokenType': 'Bearer',
+                'tokenExpiresAt': '2025-01-01T00:00:00+00:00',
+                'timezone': 'America/Chicago',
+                'lastIndexedDate': '2025-01-01',
+            },
+            'latestFitbitData': dict(latest),
+        })
+        for i in range(num_users)
+    ]
+
+
+def project(docs, field_paths):
+    """What query.select(field_paths) returns: only the listed (dotted) fields"""
+    projected = []
+    for doc in docs:
+        data = {}
+        for path in field_paths:
+            source, target = doc._data, data
+            *parents, leaf = path.split('.')
+            for key in parents:
+                source = source.get(key) or {}
+                target = target.setdefault(key, {})
+            if leaf in source:
+                target[leaf] = source[leaf]
+        projected.append(FakeDoc(doc.id, data))
+    return projected
+
+
+def run_legacy(docs):
+    """The dict pipeline fitbit_sync.py used before the record types"""
+    users = []
+    for doc in docs:
+        user_data = doc.to_dict()
+        user_data['uid'] = doc.id
+        if user_data.get('fitbitData', {}).get('accessToken'):
+            users.append(user_data)
+
+    results = []
+    for user in users:
+        data = API_RESPONSE
+        fitbit_data = {
+            'heartRate': data.get('heartRate'),
+            'steps': data.get('steps', 0),
+            'calories': data.get('calories', 0),
+            'distance': data.get('distance', 0),
+            'activeMinutes': data.get('activeMinutes', 0),
+            'sleep': data.get('sleep'),
+            'weight': data.get('weight'),
+            'date': data.get('date', datetime.now(timezone.utc).date().isoformat()),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'dataSource': 'fitbit_api',
+            'syncedAt': datetime.now(timezone.utc).isoformat()
+        }
+        timestamp = datetime.now(timezone.utc)
+        timeseries_data = {
+            'userId': user['uid'],
+            'timestamp': timestamp.isoformat(),
+            'date': fitbit_data['date'],
+            'metrics': {
+                'heartRate': fitbit_data.get('heartRate'),
+                'steps': fitbit_data.get('steps', 0),
+                'calories': fitbit_data.get('calories', 0),
+                'distance': fitbit_data.get('distance', 0),
+                'activeMinutes': fitbit_data.get('activeMinutes', 0)
+            },
+            'sleep': fitbit_data.get('sleep'),
+            'weight': fitbit_data.get('weight'),
+            'dataSource': fitbit_data.get('dataSource', 'fitbit_api'),
+            'syncedAt': fitbit_data.get('syncedAt'),
+            'createdAt': timestamp.isoformat()
+        }
+        latest = {'latestFitbitData': fitbit_data, 'lastDataSync': timestamp.isoformat()}
+        del timeseries_data, latest
+        results.append({
+            'user': user.get('email', 'unknown'),
+            'status': 'success',
+            'data': {
+                'steps': fitbit_data.get('steps', 0),
+                'calories': fitbit_data.get('calories', 0),
+                'heartRate': fitbit_data.get('heartRate')
+            }
+        })
+    return users, results
+
+
+def run_records(docs):
+    """The record pipeline of FitbitDataSync.process_user / save_timeseries_data,
+    fed the projected documents its select(USER_FIELDS) query returns"""
+    users = [user for user in map(UserRef.from_doc, docs) if user]
+
+    result = SyncResult()
+    for user in users:
+        sample = Sample(API_RESPONSE, tz=user.timezone)
+        doc_id = sample.timeseries_doc_id(user.uid)
+        timeseries_data = sample.to_timeseries_dict(user.uid)
+        changes = sample.latest_changes(user.latest)
+        if changes:
+            user.latest = sample.to_latest_dict()
+        del doc_id, timeseries_data, changes, sample
+        result.record(STATUS_SUCCESS)
+    return users, result
+
+
+def measure(fn, docs):
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    retained = fn(docs)
+    cpu = time.process_time() - cpu_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return current, peak, cpu
+
+
+def main():
+    num_users = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    docs = make_docs(num_users)
+
+    print(f"📊 SYNC RECORD BENCHMARK ({num_users} users)")
+    print("=" * 50)
+    rows = {}
+    inputs = {'dicts': (run_legacy, docs), 'records': (run_records, project(docs, USER_FIELDS))}
+    for name, (fn, fn_docs) in inputs.items():
+        current, peak, cpu = measure(fn, fn_docs)
+        rows[name] = (current, peak, cpu)
+        print(f"{name:>8}: retained {current / num_users:7.0f} B/user, "
+              f"peak {peak / num_users:7.0f} B/user, cpu {cpu * 1e6 / num_users:6.1f} µs/user")
+
+    old, new = rows['dicts'], rows['records']
+    print(f"\n✅ Retained memory: {100 * (1 - new[0] / old[0]):.0f}% less")
+    print(f"✅ CPU time:        {100 * (1 - new[2] / old[2]):.0f}% less")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,8 @@ exports.handler = async (event) => {
     
     // Fetch data from Fitbit API
     console.log('📡 Fetching data from Fitbit API...');
-    const fitbitData = await fetchFitbitData(accessToken);
+    const timezone = event.queryStringParameters?.timezone || null;
+    const fitbitData = await fetchFitbitData(accessToken, { timezone });
     
     console.log('✅ Fitbit data fetched successfully');
     console.log('Data:', JSON.stringify(fitbitData, null, 2));
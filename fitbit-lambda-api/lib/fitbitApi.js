@@ -45,9 +45,46 @@ const getDeviceSyncStatus = async (accessToken) => {
   }
 };
 
+// Resolve the user's timezone from their Fitbit profile (null if unavailable)
+const getUserTimezone = async (accessToken) => {
+  try {
+    const response = await fetch('https://api.fitbit.com/1/user/-/profile.json', {
+      headers: {
+        'Authorization': `Bearer ${accessToken}`,
+        'Accept': 'application/json'
+      }
+    });
+    
+    if (!response.ok) {
+      throw new Error(`Profile API failed: ${response.status}`);
+    }
+    
+    const profile = await response.json();
+    return profile?.user?.timezone || null;
+    
+  } catch (error) {
+    console.error('❌ Error getting user timezone:', error);
+    return null;
+  }
+};
+
+// Today's YYYY-MM-DD date in the given timezone, falling back to UTC
+const getLocalDate = (timezone) => {
+  try {
+    return new Date().toLocaleDateString('en-CA', { timeZone: timezone || 'UTC' }); // en-CA gives YYYY-MM-DD format
+  } catch (error) {
+    console.log(`Unknown timezone ${timezone}, using UTC`);
+    return new Date().toISOString().split('T')[0];
+  }
+};
+
 // SINGLE, COMPLETE fetchFitbitData function with all features
-const fetchFitbitData = async (accessToken) => {
-  const today = new Date().toISOString().split('T')[0];
+// Pass a cached timezone to skip the profile lookup; the response's timezone is
+// null when it could not be resolved, so callers don't cache the UTC fallback
+const fetchFitbitData = async (accessToken, { timezone = null } = {}) => {
+  const userTimezone = timezone || await getUserTimezone(accessToken);
+  const today = getLocalDate(userTimezone);
+  console.log(`🌍 Using local date ${today} (${userTimezone || 'UTC fallback'})`);
   
   try {
     // Get both activity data AND device sync status in parallel
@@ -124,6 +161,7 @@ const fetchFitbitData = async (accessToken) => {
       distance,
       activeMinutes,
       date: today,
+      timezone: userTimezone,
       lastSync: new Date().toISOString(),
       // Add device sync information
       deviceSync: deviceSyncStatus
@@ -212,5 +250,6 @@ module.exports = {
   fetchFitbitData,
   refreshFitbitToken,
   exchangeCodeForTokens,
-  getDeviceSyncStatus
+  getDeviceSyncStatus,
+  getUserTimezone
 };
\ No newline at end of file
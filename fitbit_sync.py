@@ -17,6 +17,10 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 from concurrent.futures import ThreadPoolExecutor
 import time
+from sync_records import (
+    USER_FIELDS, UserRef, Sample, SyncResult,
+    STATUS_SUCCESS, STATUS_NO_TOKEN, STATUS_FAILED, STATUS_NO_DATA, STATUS_ERROR,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -112,27 +116,24 @@ class FitbitDataSync:
         if self.session:
             await self.session.close()
     
-    def get_all_fitbit_users(self) -> List[Dict[str, Any]]:
+    def get_all_fitbit_users(self) -> List[UserRef]:
         """Get all users who have Fitbit connected"""
         try:
             logger.info("🔍 Fetching all Fitbit users from Firestore...")
             
             users_ref = self.db.collection('users')
             
-            # Query for users with Fitbit connected
+            # Query for users with Fitbit connected, fetching only the fields the sync uses
             query = users_ref.where('selectedDevice', '==', 'fitbit').where('deviceConnected', '==', True)
-            docs = query.stream()
+            docs = query.select(USER_FIELDS).stream()
             
             users = []
             for doc in docs:
-                user_data = doc.to_dict()
-                user_data['uid'] = doc.id
-                
-                # Check if user has valid Fitbit tokens
-                fitbit_data = user_data.get('fitbitData', {})
-                if fitbit_data.get('accessToken') or fitbit_data.get('authCode'):
-                    users.append(user_data)
-                    logger.debug(f"Found Fitbit user: {user_data.get('email', 'unknown')}")
+                # Skips users without valid Fitbit tokens
+                user = UserRef.from_doc(doc)
+                if user:
+                    users.append(user)
+                    logger.debug(f"Found Fitbit user: {user.email}")
             
             logger.info(f"✅ Found {len(users)} users with Fitbit connected")
             return users
@@ -170,8 +171,11 @@ class FitbitDataSync:
             logger.error(f"❌ Error refreshing token: {e}")
             return None
     
-    async def fetch_fitbit_data(self, access_token: str) -> Optional[Dict[str, Any]]:
-        """Fetch Fitbit data using serverless API"""
+    async def fetch_fitbit_data(self, access_token: str, tz: Optional[str] = None) -> Optional[Sample]:
+        """Fetch Fitbit data for the user's local day using serverless API
+
+        Without a cached timezone the API resolves it from the Fitbit profile.
+        """
         try:
             logger.debug("📡 Fetching Fitbit data from serverless API...")
             
@@ -182,7 +186,8 @@ class FitbitDataSync:
             
             async with self.session.get(
                 f"{self.api_base_url}/fitbit",
-                headers=headers
+                headers=headers,
+                params={'timezone': tz} if tz else None
             ) as response:
                 
                 if response.status == 200:
@@ -190,19 +195,7 @@ class FitbitDataSync:
                     logger.debug("✅ Fitbit data fetched successfully")
                     
                     # Structure the data consistently
-                    return {
-                        'heartRate': data.get('heartRate'),
-                        'steps': data.get('steps', 0),
-                        'calories': data.get('calories', 0),
-                        'distance': data.get('distance', 0),
-                        'activeMinutes': data.get('activeMinutes', 0),
-                        'sleep': data.get('sleep'),
-                        'weight': data.get('weight'),
-                        'date': data.get('date', datetime.now(timezone.utc).date().isoformat()),
-                        'timestamp': datetime.now(timezone.utc).isoformat(),
-                        'dataSource': 'fitbit_api',
-                        'syncedAt': datetime.now(timezone.utc).isoformat()
-                    }
+                    return Sample(data, tz=tz)
                     
                 elif response.status == 401:
                     logger.warning("🔑 Access token expired, needs refresh")
@@ -232,64 +225,68 @@ class FitbitDataSync:
         except Exception as e:
             logger.error(f"❌ Error updating user tokens: {e}")
     
-    def save_timeseries_data(self, user_uid: str, fitbit_data: Dict[str, Any]):
+    def save_timeseries_data(self, user: UserRef, sample: Sample):
         """Save Fitbit data to timeseries collection"""
+        user_uid = user.uid
         try:
-            # Create timeseries document
-            timestamp = datetime.now(timezone.utc)
-            doc_id = f"{user_uid}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
-            
-            timeseries_data = {
-                'userId': user_uid,
-                'timestamp': timestamp.isoformat(),
-                'date': fitbit_data['date'],
-                'metrics': {
-                    'heartRate': fitbit_data.get('heartRate'),
-                    'steps': fitbit_data.get('steps', 0),
-                    'calories': fitbit_data.get('calories', 0),
-                    'distance': fitbit_data.get('distance', 0),
-                    'activeMinutes': fitbit_data.get('activeMinutes', 0)
-                },
-                'sleep': fitbit_data.get('sleep'),
-                'weight': fitbit_data.get('weight'),
-                'dataSource': fitbit_data.get('dataSource', 'fitbit_api'),
-                'syncedAt': fitbit_data.get('syncedAt'),
-                'createdAt': timestamp.isoformat()
-            }
-            
             # Save to timeseries collection
-            self.db.collection('fitbit_timeseries').document(doc_id).set(timeseries_data)
-            
-            # Also update user's latest data
-            self.db.collection('users').document(user_uid).update({
-                'latestFitbitData': fitbit_data,
-                'lastDataSync': timestamp.isoformat(),
-                'lastUpdated': timestamp.isoformat()
-            })
+            doc_id = sample.timeseries_doc_id(user_uid)
+            self.db.collection('fitbit_timeseries').document(doc_id).set(sample.to_timeseries_dict(user_uid))
+            
+            # Record the local date in the user's day index the first time it has data
+            if sample.date != user.indexed_date:
+                self.db.collection('fitbit_day_index').document(user_uid).set({
+                    'userId': user_uid,
+                    'dates': firestore.ArrayUnion([sample.date]),
+                    'timezone': sample.zone,
+                    'lastUpdated': sample.synced_at
+                }, merge=True)
+            
+            # Also update user's latest data, touching only the fields that changed
+            changes = sample.latest_changes(user.latest)
+            latest_changed = bool(changes)
+            if latest_changed:
+                changes['lastDataSync'] = sample.synced_at
+                changes['lastUpdated'] = sample.synced_at
+            
+            # Cache only a timezone the API actually resolved, never the UTC fallback
+            if sample.timezone and sample.timezone != user.timezone:
+                changes['fitbitData.timezone'] = sample.timezone
+            if sample.date != user.indexed_date:
+                changes['fitbitData.lastIndexedDate'] = sample.date
+            
+            if changes:
+                self.db.collection('users').document(user_uid).update(changes)
+                if latest_changed:
+                    user.latest = sample.to_latest_dict()
+                user.timezone = sample.timezone or user.timezone
+                user.indexed_date = sample.date
+                logger.debug(f"✅ Updated {len(changes)} user fields for user {user_uid}")
+            else:
+                logger.debug(f"⏭️ Latest data unchanged for user {user_uid}, skipping user update")
             
             logger.debug(f"✅ Saved timeseries data for user {user_uid}")
             
         except Exception as e:
             logger.error(f"❌ Error saving timeseries data for user {user_uid}: {e}")
     
-    async def process_user(self, user: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a single user's Fitbit data"""
-        user_uid = user['uid']
-        email = user.get('email', 'unknown')
+    async def process_user(self, user: UserRef) -> str:
+        """Process a single user's Fitbit data and return the sync status"""
+        user_uid = user.uid
+        email = user.email
         
         try:
             logger.info(f"🔄 Processing user: {email}")
             
-            fitbit_data = user.get('fitbitData', {})
-            access_token = fitbit_data.get('accessToken')
-            refresh_token = fitbit_data.get('refreshToken')
+            access_token = user.access_token
+            refresh_token = user.refresh_token
             
             if not access_token:
                 logger.warning(f"⚠️ No access token for user {email}")
-                return {'user': email, 'status': 'no_token', 'error': 'No access token'}
+                return STATUS_NO_TOKEN
             
             # Try to fetch data with current token
-            data = await self.fetch_fitbit_data(access_token)
+            data = await self.fetch_fitbit_data(access_token, user.timezone)
             
             # If token expired, try to refresh
             if data is None and refresh_token:
@@ -301,32 +298,25 @@ class FitbitDataSync:
                     self.update_user_tokens(user_uid, new_token_data)
                     
                     # Try fetching data again with new token
-                    data = await self.fetch_fitbit_data(new_token_data['accessToken'])
+                    data = await self.fetch_fitbit_data(new_token_data['accessToken'], user.timezone)
                 
                 if data is None:
                     logger.error(f"❌ Failed to fetch data for user {email} even after token refresh")
-                    return {'user': email, 'status': 'failed', 'error': 'Token refresh failed'}
+                    return STATUS_FAILED
             
             if data:
                 # Save to timeseries
-                self.save_timeseries_data(user_uid, data)
-                logger.info(f"✅ Successfully processed user {email}")
-                return {
-                    'user': email, 
-                    'status': 'success', 
-                    'data': {
-                        'steps': data.get('steps', 0),
-                        'calories': data.get('calories', 0),
-                        'heartRate': data.get('heartRate')
-                    }
-                }
+                self.save_timeseries_data(user, data)
+                logger.info(f"✅ Successfully processed user {email} "
+                            f"(steps={data.steps}, calories={data.calories}, heartRate={data.heart_rate})")
+                return STATUS_SUCCESS
             else:
                 logger.error(f"❌ No data retrieved for user {email}")
-                return {'user': email, 'status': 'no_data', 'error': 'No data retrieved'}
+                return STATUS_NO_DATA
                 
         except Exception as e:
             logger.error(f"❌ Error processing user {email}: {e}")
-            return {'user': email, 'status': 'error', 'error': str(e)}
+            return STATUS_ERROR
     
     async def sync_all_users(self):
         """Main method to sync all users' Fitbit data"""
@@ -346,20 +336,24 @@ class FitbitDataSync:
             
             # Process users concurrently (but with reasonable limits)
             semaphore = asyncio.Semaphore(5)  # Limit concurrent requests
+            result = SyncResult()
             
             async def process_with_semaphore(user):
                 async with semaphore:
-                    return await self.process_user(user)
+                    result.record(await self.process_user(user))
             
-            # Process all users
-            results = await asyncio.gather(
+            # Process all users; per-user failures are logged as they happen
+            outcomes = await asyncio.gather(
                 *[process_with_semaphore(user) for user in users],
                 return_exceptions=True
             )
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    result.record(STATUS_ERROR)
             
             # Summarize results
-            successful = sum(1 for r in results if isinstance(r, dict) and r.get('status') == 'success')
-            failed = len(results) - successful
+            successful = result.successful
+            failed = result.unsuccessful
             
             elapsed_time = time.time() - start_time
             
@@ -367,11 +361,6 @@ class FitbitDataSync:
             logger.info(f"✅ Successful: {successful}")
             logger.info(f"❌ Failed: {failed}")
             
-            # Log details of failed users
-            for result in results:
-                if isinstance(result, dict) and result.get('status') != 'success':
-                    logger.warning(f"Failed user: {result.get('user', 'unknown')} - {result.get('error', 'unknown error')}")
-            
             # Save sync summary to Firestore
             sync_summary = {
                 'timestamp': datetime.now(timezone.utc).isoformat(),
@@ -379,7 +368,7 @@ class FitbitDataSync:
                 'successful': successful,
                 'failed': failed,
                 'duration': elapsed_time,
-                'results': [r for r in results if isinstance(r, dict)]
+                'statusCounts': result.counts()
             }
             
             self.db.collection('sync_logs').add(sync_summary)
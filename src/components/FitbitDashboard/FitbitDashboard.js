@@ -3,7 +3,7 @@ import React, { useEffect, useState, useCallback } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import { onAuthStateChanged, signOut } from 'firebase/auth';
 import { auth, db } from '../../firebase-config';
-import { doc, getDoc, setDoc, collection, getDocs } from 'firebase/firestore';
+import { doc, getDoc, setDoc, collection, getDocs, query, where } from 'firebase/firestore';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import "../Common.css";
 import './FitbitDashboard.css';
@@ -41,6 +41,18 @@ const updateUserTimezone = async (userId) => {
   }
 };
 
+// Sorted local dates (YYYY-MM-DD) that have synced data, or null if the user has no day index yet
+const getIndexedDates = async (userId) => {
+  try {
+    const indexDoc = await getDoc(doc(db, 'fitbit_day_index', userId));
+    if (!indexDoc.exists()) return null;
+    return [...(indexDoc.data().dates || [])].sort();
+  } catch (error) {
+    console.warn('⚠️ Could not load day index:', error);
+    return null;
+  }
+};
+
 const FitbitDashboard = () => {
   const [user, setUser] = useState(null);
   const [userData, setUserData] = useState(null);
@@ -362,7 +374,8 @@ const startFitbitConnection = () => {
   }, []);
 
   // Enhanced timezone-aware fetchTimeseriesData
-  const fetchTimeseriesData = useCallback(async (date, userId) => {
+  // Pass already-loaded indexed dates (or null) to skip reading the day index again
+  const fetchTimeseriesData = useCallback(async (date, userId, knownIndexedDates) => {
     if (!userId) return;
     
     try {
@@ -397,22 +410,37 @@ const startFitbitConnection = () => {
         dateStrings.push(dateString);
       }
       
-      console.log('🔍 Searching date strings for', userTimezone, ':', dateStrings);
-      
       const timeseriesRef = collection(db, 'fitbit_timeseries');
-      const querySnapshot = await getDocs(timeseriesRef);
+      
+      // Indexed days are stored under the user's local date, so read them directly.
+      // Days synced before the index existed fall back to scanning nearby dates, and so
+      // does the first indexed day, whose earlier docs may carry the next UTC date
+      const indexedDates = knownIndexedDates !== undefined ? knownIndexedDates : await getIndexedDates(userId);
+      const indexed = !!indexedDates?.includes(date) && date !== indexedDates[0];
+      let querySnapshot;
+      if (indexed) {
+        console.log('🔍 Reading indexed date', date);
+        querySnapshot = await getDocs(query(timeseriesRef, where('userId', '==', userId), where('date', '==', date)));
+      } else {
+        console.log('🔍 Searching date strings for', userTimezone, ':', dateStrings);
+        querySnapshot = await getDocs(timeseriesRef);
+      }
       const data = [];
       
       querySnapshot.forEach((docSnapshot) => {
         const docId = docSnapshot.id;
         const docData = docSnapshot.data();
         
+        // Docs written with a timezone are already bucketed by local date; older
+        // docs carry a UTC date and need the local-date check below
+        const localDated = !!docData.timezone;
+        
         // Check if document matches any of our date patterns
         const matchesAnyDate = dateStrings.some(dateStr => 
           docId.startsWith(`${userId}_${dateStr}_`)
         );
         
-        if (matchesAnyDate) {
+        if (localDated ? docData.date === date : matchesAnyDate) {
           console.log('📊 Found matching document:', docId);
           
           // Extract calories and other metrics
@@ -452,8 +480,10 @@ const startFitbitConnection = () => {
                 const hours = timePart.substring(0, 2);
                 const minutes = timePart.substring(2, 4);
                 const seconds = timePart.substring(4, 6);
+                // Local-dated IDs carry their UTC offset (HHMMSS+hhmm); older IDs are UTC
+                const offset = timePart.length >= 11 ? `${timePart.substring(6, 9)}:${timePart.substring(9, 11)}` : 'Z';
                 
-                actualTimestamp = new Date(`${year}-${month}-${day}T${hours}:${minutes}:${seconds}Z`);
+                actualTimestamp = new Date(`${year}-${month}-${day}T${hours}:${minutes}:${seconds}${offset}`);
               }
             }
           }
@@ -476,7 +506,7 @@ const startFitbitConnection = () => {
               userTimezone: userTimezone
             });
             
-            if (pointDateLocal === targetDateLocal) {
+            if (localDated || pointDateLocal === targetDateLocal) {
               // Display in user's timezone
               const displayTime = actualTimestamp.toLocaleTimeString('en-US', {
                 hour: '2-digit',
@@ -644,6 +674,28 @@ const startFitbitConnection = () => {
   const navigateDate = useCallback(async (direction) => {
     if (!user?.uid) return;
     
+    // Every day with data from the first indexed date on is in the index, so jump
+    // straight to the neighbouring indexed date once inside that range
+    const indexedDates = await getIndexedDates(user.uid);
+    const firstIndexedDate = indexedDates?.[0];
+    if (firstIndexedDate && selectedDate >= firstIndexedDate) {
+      const targetDate = direction === 'prev'
+        ? [...indexedDates].reverse().find(d => d < selectedDate)
+        : indexedDates.find(d => d > selectedDate);
+      
+      if (targetDate) {
+        setSelectedDate(targetDate);
+        await fetchTimeseriesData(targetDate, user.uid, indexedDates);
+        return;
+      }
+      
+      if (direction === 'next') {
+        console.log('📊 No data found in the specified direction');
+        return;
+      }
+    }
+    
+    // Days before the index started are only found by scanning
     const currentDate = new Date(selectedDate);
     let newDate = new Date(currentDate);
     
@@ -655,11 +707,19 @@ const startFitbitConnection = () => {
       }
       
       const dateString = newDate.toISOString().split('T')[0];
+      
+      // Stop the forward scan at the first indexed date, which is known to have data
+      if (direction === 'next' && firstIndexedDate && dateString >= firstIndexedDate) {
+        setSelectedDate(firstIndexedDate);
+        await fetchTimeseriesData(firstIndexedDate, user.uid, indexedDates);
+        return;
+      }
+      
       const hasData = await checkDateHasData(dateString, user.uid);
       
       if (hasData) {
         setSelectedDate(dateString);
-        await fetchTimeseriesData(dateString, user.uid);
+        await fetchTimeseriesData(dateString, user.uid, indexedDates);
         return;
       }
     }
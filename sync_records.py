@@ -0,0 +1,205 @@
+"""
+Compact record types for the Fitbit sync hot path
+UserRef, Sample and SyncResult replace the plain dicts fitbit_sync.py used to
+carry from Firestore through the API call to the sync summary
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Fields requested from Firestore when listing users (see UserRef.from_doc)
+USER_FIELDS = [
+    'email',
+    'fitbitData.accessToken',
+    'fitbitData.refreshToken',
+    'fitbitData.authCode',
+    'fitbitData.timezone',
+    'fitbitData.lastIndexedDate',
+    'latestFitbitData',
+]
+
+# latestFitbitData keys that change on every sync and are only written alongside a real change
+VOLATILE_LATEST_FIELDS = ('timestamp', 'syncedAt')
+
+# Per-user sync outcomes
+STATUS_SUCCESS = 'success'
+STATUS_NO_TOKEN = 'no_token'
+STATUS_FAILED = 'failed'
+STATUS_NO_DATA = 'no_data'
+STATUS_ERROR = 'error'
+
+
+class UserRef:
+    """The handful of user document fields the sync actually needs"""
+
+    __slots__ = ('uid', 'email', 'access_token', 'refresh_token', 'latest', 'timezone', 'indexed_date')
+
+    def __init__(self, uid: str, email: str, access_token: Optional[str], refresh_token: Optional[str],
+                 latest: Optional[Dict[str, Any]] = None, timezone: Optional[str] = None,
+                 indexed_date: Optional[str] = None):
+        self.uid = uid
+        self.email = email
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        # Last latestFitbitData written to the user document, used to diff the next write
+        self.latest = latest
+        # Timezone cached from the Fitbit profile and the newest date in fitbit_day_index
+        self.timezone = timezone
+        self.indexed_date = indexed_date
+
+    @classmethod
+    def from_doc(cls, doc) -> Optional['UserRef']:
+        """Build from a Firestore snapshot, or None if the user has no Fitbit tokens"""
+        user_data = doc.to_dict() or {}
+        fitbit_data = user_data.get('fitbitData') or {}
+        if not (fitbit_data.get('accessToken') or fitbit_data.get('authCode')):
+            return None
+        return cls(
+            doc.id,
+            user_data.get('email', 'unknown'),
+            fitbit_data.get('accessToken'),
+            fitbit_data.get('refreshToken'),
+            user_data.get('latestFitbitData'),
+            fitbit_data.get('timezone'),
+            fitbit_data.get('lastIndexedDate'),
+        )
+
+
+def resolve_timezone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """ZoneInfo for an IANA timezone name, or None if it is missing or unknown"""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+class Sample:
+    """One Fitbit reading, stamped with a single sync time formatted once
+
+    `date` is the user's local date, as reported by the API or derived from `zone`.
+    `timezone` is only set when the API resolved a valid zone, so a UTC fallback
+    is never mistaken for the user's real timezone.
+    """
+
+    __slots__ = (
+        'heart_rate', 'steps', 'calories', 'distance', 'active_minutes',
+        'sleep', 'weight', 'date', 'timezone', 'synced_at', 'local',
+    )
+
+    def __init__(self, data: Dict[str, Any], now: Optional[datetime] = None, tz: Optional[str] = None):
+        now = now or datetime.now(timezone.utc)
+        api_zone = resolve_timezone(data.get('timezone'))
+        self.timezone = api_zone.key if api_zone else None
+        self.local = now.astimezone(api_zone or resolve_timezone(tz) or ZoneInfo('UTC'))
+        self.heart_rate = data.get('heartRate')
+        self.steps = data.get('steps', 0)
+        self.calories = data.get('calories', 0)
+        self.distance = data.get('distance', 0)
+        self.active_minutes = data.get('activeMinutes', 0)
+        self.sleep = data.get('sleep')
+        self.weight = data.get('weight')
+        self.date = data.get('date') or self.local.date().isoformat()
+        self.synced_at = now.isoformat()
+
+    @property
+    def zone(self) -> str:
+        """Name of the timezone the sample's local date and time were computed in"""
+        return self.local.tzinfo.key
+
+    def metrics(self) -> Dict[str, Any]:
+        """Daily activity metrics as stored in Firestore"""
+        return {
+            'heartRate': self.heart_rate,
+            'steps': self.steps,
+            'calories': self.calories,
+            'distance': self.distance,
+            'activeMinutes': self.active_minutes,
+        }
+
+    def to_latest_dict(self) -> Dict[str, Any]:
+        """Shape written to users/{uid}.latestFitbitData"""
+        latest = self.metrics()
+        latest.update({
+            'sleep': self.sleep,
+            'weight': self.weight,
+            'date': self.date,
+            'timestamp': self.synced_at,
+            'dataSource': 'fitbit_api',
+            'syncedAt': self.synced_at,
+        })
+        return latest
+
+    def latest_changes(self, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Dotted-path update for users/{uid}.latestFitbitData against the previously written map
+
+        Returns an empty dict when nothing but the sync time changed. The whole map is
+        rewritten when there is no previous map or it has a different set of keys.
+        """
+        latest = self.to_latest_dict()
+        if not isinstance(previous, dict) or previous.keys() != latest.keys():
+            return {'latestFitbitData': latest}
+
+        changes = {
+            f"latestFitbitData.{key}": value
+            for key, value in latest.items()
+            if key not in VOLATILE_LATEST_FIELDS and previous.get(key) != value
+        }
+        if changes:
+            for key in VOLATILE_LATEST_FIELDS:
+                changes[f"latestFitbitData.{key}"] = latest[key]
+        return changes
+
+    def to_timeseries_dict(self, user_uid: str) -> Dict[str, Any]:
+        """Shape written to the fitbit_timeseries collection"""
+        return {
+            'userId': user_uid,
+            'timestamp': self.synced_at,
+            'date': self.date,
+            'metrics': self.metrics(),
+            'sleep': self.sleep,
+            'weight': self.weight,
+            'timezone': self.zone,
+            'dataSource': 'fitbit_api',
+            'syncedAt': self.synced_at,
+            'createdAt': self.synced_at,
+        }
+
+    def timeseries_doc_id(self, user_uid: str) -> str:
+        """Doc ID stamped with the local date and time, so IDs group by the user's day
+
+        The UTC offset keeps IDs unique in the hour repeated when DST ends.
+        """
+        return f"{user_uid}_{self.date.replace('-', '')}_{self.local.strftime('%H%M%S%z')}"
+
+
+class SyncResult:
+    """Per-status counters for a sync run; individual results are not retained"""
+
+    __slots__ = (STATUS_SUCCESS, STATUS_NO_TOKEN, STATUS_FAILED, STATUS_NO_DATA, STATUS_ERROR)
+
+    def __init__(self):
+        for status in self.__slots__:
+            setattr(self, status, 0)
+
+    def record(self, status: str):
+        if status not in self.__slots__:
+            status = STATUS_ERROR
+        setattr(self, status, getattr(self, status) + 1)
+
+    @property
+    def total(self) -> int:
+        return sum(getattr(self, status) for status in self.__slots__)
+
+    @property
+    def successful(self) -> int:
+        return self.success
+
+    @property
+    def unsuccessful(self) -> int:
+        return self.total - self.success
+
+    def counts(self) -> Dict[str, int]:
+        return {status: getattr(self, status) for status in self.__slots__}